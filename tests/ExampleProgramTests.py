@@ -0,0 +1,519 @@
+import unittest
+
+import sys
+
+import tempfile
+
+from pathlib import Path
+
+from unittest import mock
+
+ 
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tool"))
+
+ 
+
+import ExampleProgram
+
+import pandas as pd
+
+import os
+
+from ExampleProgram import CSVProcessor, DataAggregator, FileValidator, FileWriter
+
+ 
+
+class TestCSVProcessor(unittest.TestCase):
+
+    
+
+    def setUp(self):
+
+        """
+
+        Create a temporary directory for the test CSV files.
+
+        """
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        self.base_path = Path(self.temp_dir.name)
+
+    
+
+    def tearDown(self):
+
+        """
+
+        Clean up the test files.
+
+        """
+
+        self.temp_dir.cleanup()
+
+    
+
+    def write_csv(self, name, text):
+
+        """
+
+        Helper method to write a CSV file and return its path.
+
+        """
+
+        path = self.base_path / name
+
+        path.write_text(text)
+
+        return str(path)
+
+    
+
+    def test_mismatched_column_types(self):
+
+        """
+
+        Test that files whose column types differ are still concatenated.
+
+        """
+
+        files = [
+
+            self.write_csv("a.csv", "id,value\n1,10\n2,20\n"),
+
+            self.write_csv("b.csv", "id,value\nx,30\n"),
+
+        ]
+
+        
+
+        for pyarrow_module in (ExampleProgram.pa, None):
+
+            with self.subTest(pyarrow=pyarrow_module is not None):
+
+                with mock.patch.object(ExampleProgram, "pa", pyarrow_module):
+
+                    df = CSVProcessor.read_and_concat_csvs(files)
+
+                
+
+                self.assertIsNotNone(df)
+
+                self.assertEqual([str(v) for v in df["id"]], ["1", "2", "x"])
+
+                self.assertEqual(list(df["value"]), [10, 20, 30])
+
+    
+
+    def test_conflicting_columns_keep_source_text(self):
+
+        """
+
+        Test that columns converted to text because of a type conflict keep the original values.
+
+        """
+
+        files = [
+
+            self.write_csv("c1.csv", "d,f,flag\n2024-01-01,1.0,true\n2024-01-02 10:00:00,2.50,false\n"),
+
+            self.write_csv("c2.csv", "d,f,flag\nunknown,x,maybe\n"),
+
+        ]
+
+        
+
+        for streaming in (False, True):
+
+            with self.subTest(streaming=streaming):
+
+                df = CSVProcessor.read_and_concat_csvs(files, streaming=streaming)
+
+                
+
+                self.assertIsNotNone(df)
+
+                self.assertEqual(list(df["d"]), ["2024-01-01", "2024-01-02 10:00:00", "unknown"])
+
+                self.assertEqual(list(df["f"]), ["1.0", "2.50", "x"])
+
+                self.assertEqual(list(df["flag"]), ["true", "false", "maybe"])
+
+    
+
+    def test_duplicate_headers_are_renamed_like_pandas(self):
+
+        """
+
+        Test that repeated header names become 'a.1' instead of failing the aggregation.
+
+        """
+
+        files = [
+
+            self.write_csv("dup.csv", "a,a,b\n1,2,3\n"),
+
+            self.write_csv("plain.csv", "a,b\n4,5\n"),
+
+        ]
+
+        
+
+        for pyarrow_module in (ExampleProgram.pa, None):
+
+            with self.subTest(pyarrow=pyarrow_module is not None):
+
+                with mock.patch.object(ExampleProgram, "pa", pyarrow_module):
+
+                    df = CSVProcessor.read_and_concat_csvs(files)
+
+                
+
+                self.assertIsNotNone(df)
+
+                self.assertEqual(list(df.columns), ["a", "a.1", "b"])
+
+                self.assertEqual(list(df["a"]), [1, 4])
+
+                self.assertEqual(list(df["b"]), [3, 5])
+
+    
+
+    def test_short_rows_are_kept(self):
+
+        """
+
+        Test that a row with missing trailing fields is kept with the gaps left empty.
+
+        """
+
+        files = [self.write_csv("short.csv", "a,b\n1,2\n3\n")]
+
+        
+
+        for pyarrow_module in (ExampleProgram.pa, None):
+
+            with self.subTest(pyarrow=pyarrow_module is not None):
+
+                with mock.patch.object(ExampleProgram, "pa", pyarrow_module):
+
+                    df = CSVProcessor.read_and_concat_csvs(files, dtype={"a": "float64"})
+
+                
+
+                self.assertIsNotNone(df)
+
+                self.assertEqual(list(df["a"]), [1.0, 3.0])
+
+                self.assertEqual(df["b"][0], 2)
+
+                self.assertTrue(pd.isna(df["b"][1]))
+
+    
+
+    @unittest.skipIf(ExampleProgram.pa is None, "pyarrow is not installed")
+
+    def test_rechunk_targets_chunk_bytes_of_widest_column(self):
+
+        """
+
+        Test that many tiny chunks are merged into blocks of about TARGET_CHUNK_BYTES.
+
+        """
+
+        pa = ExampleProgram.pa
+
+        table = pa.concat_tables([
+
+            pa.table({"id": list(range(10)), "text": ["x" * 1000] * 10})
+
+            for _ in range(2000)
+
+        ])
+
+        
+
+        rechunked = CSVProcessor.rechunk(table)
+
+        
+
+        self.assertTrue(rechunked.equals(table))
+
+        self.assertLess(rechunked.column("text").num_chunks, table.column("text").num_chunks)
+
+        for chunk in rechunked.column("text").chunks:
+
+            self.assertLessEqual(chunk.nbytes, 2 * ExampleProgram.TARGET_CHUNK_BYTES)
+
+    
+
+    def test_pandas_dtype_specs(self):
+
+        """
+
+        Test that object, str and category dtypes work with and without pyarrow.
+
+        """
+
+        files = [self.write_csv("codes.csv", "code,label,count\n007,a,1\n042,b,2\n")]
+
+        dtype = {"code": object, "label": "category", "count": str}
+
+        
+
+        for pyarrow_module in (ExampleProgram.pa, None):
+
+            with self.subTest(pyarrow=pyarrow_module is not None):
+
+                with mock.patch.object(ExampleProgram, "pa", pyarrow_module):
+
+                    df = CSVProcessor.read_and_concat_csvs(files, dtype=dtype)
+
+                
+
+                self.assertIsNotNone(df)
+
+                self.assertEqual(list(df["code"]), ["007", "042"])
+
+                self.assertEqual([str(v) for v in df["label"]], ["a", "b"])
+
+                self.assertEqual(list(df["count"]), ["1", "2"])
+
+    
+
+    def test_unsupported_dtype_raises_before_reading(self):
+
+        """
+
+        Test that an unknown column type raises ValueError without reading any file.
+
+        """
+
+        files = [self.write_csv("a.csv", "id\n1\n")]
+
+        
+
+        for pyarrow_module in (ExampleProgram.pa, None):
+
+            with self.subTest(pyarrow=pyarrow_module is not None):
+
+                with mock.patch.object(ExampleProgram, "pa", pyarrow_module):
+
+                    with mock.patch.object(CSVProcessor, "read_csv") as read_csv:
+
+                        with self.assertRaises(ValueError):
+
+                            CSVProcessor.read_and_concat_csvs(files, dtype={"id": "not-a-type"})
+
+                read_csv.assert_not_called()
+
+ 
+
+class TestFileValidator(unittest.TestCase):
+
+    
+
+    def setUp(self):
+
+        """
+
+        Create a temporary directory with one CSV file.
+
+        """
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        self.csv_file = Path(self.temp_dir.name) / "data.csv"
+
+        self.csv_file.write_text("a\n1\n")
+
+    
+
+    def tearDown(self):
+
+        """
+
+        Clean up the test files.
+
+        """
+
+        self.temp_dir.cleanup()
+
+    
+
+    def test_unreachable_path_is_reported_missing(self):
+
+        """
+
+        Test that a path below a regular file is rejected like a missing path.
+
+        """
+
+        path = str(self.csv_file / "x.csv")
+
+        
+
+        with self.assertLogs(ExampleProgram.logger, level="WARNING") as logs:
+
+            self.assertEqual(FileValidator.validate_file_paths([path]), [])
+
+        
+
+        self.assertIn("Path does not exist", logs.output[0])
+
+    
+
+    def test_file_created_between_runs_is_found(self):
+
+        """
+
+        Test that validation reflects files created after an earlier run.
+
+        """
+
+        path = str(Path(self.temp_dir.name) / "late.csv")
+
+        
+
+        with self.assertLogs(ExampleProgram.logger, level="WARNING"):
+
+            self.assertEqual(FileValidator.validate_file_paths([path]), [])
+
+        
+
+        Path(path).write_text("a\n1\n")
+
+        self.assertEqual(FileValidator.validate_file_paths([path]), [path])
+
+ 
+
+class TestFileWriter(unittest.TestCase):
+
+    
+
+    def setUp(self):
+
+        """
+
+        Create a temporary output directory.
+
+        """
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    
+
+    def tearDown(self):
+
+        """
+
+        Clean up the test files.
+
+        """
+
+        self.temp_dir.cleanup()
+
+    
+
+    def test_default_output_matches_pandas(self):
+
+        """
+
+        Test that the default writer only quotes fields when needed.
+
+        """
+
+        dataframe = pd.DataFrame({"name": ["a", "b,c"], "value": [1, 2]})
+
+        
+
+        out_file = FileWriter.save_dataframe(dataframe, self.temp_dir.name)
+
+        
+
+        self.assertEqual(Path(out_file).read_text(), 'name,value\na,1\n"b,c",2\n')
+
+    
+
+    def test_arrow_writer_falls_back_on_mixed_object_column(self):
+
+        """
+
+        Test that frames Arrow cannot convert are still written.
+
+        """
+
+        dataframe = pd.DataFrame({"a": [1, "x"]})
+
+        
+
+        out_file = FileWriter.save_dataframe(dataframe, self.temp_dir.name, use_arrow=True)
+
+        
+
+        self.assertEqual(Path(out_file).read_text(), "a\n1\nx\n")
+
+ 
+
+class TestDataAggregator(unittest.TestCase):
+
+    
+
+    def setUp(self):
+
+        """
+
+        Create a temporary working directory with one CSV file.
+
+        """
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        (Path(self.temp_dir.name) / "data.csv").write_text("name,value\na,1\n")
+
+        self.cwd = os.getcwd()
+
+        os.chdir(self.temp_dir.name)
+
+    
+
+    def tearDown(self):
+
+        """
+
+        Clean up the test files.
+
+        """
+
+        os.chdir(self.cwd)
+
+        self.temp_dir.cleanup()
+
+    
+
+    def test_use_arrow_is_passed_to_writer(self):
+
+        """
+
+        Test that the writer choice reaches FileWriter.save_dataframe.
+
+        """
+
+        for use_arrow in (False, True):
+
+            with self.subTest(use_arrow=use_arrow):
+
+                with mock.patch.object(FileWriter, "save_dataframe", return_value="out.csv") as save:
+
+                    self.assertEqual(DataAggregator("data.csv", use_arrow=use_arrow).process(), "out.csv")
+
+                
+
+                self.assertEqual(save.call_args.kwargs["use_arrow"], use_arrow)
+
+ 
+
+if __name__ == '__main__':
+
+    unittest.main()
\ No newline at end of file
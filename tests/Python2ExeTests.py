@@ -4,12 +4,40 @@ import subprocess
 
 from pathlib import Path
 
+from unittest import mock
+
 import os
 
+import sys
+
 import tempfile
 
  
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tool"))
+
+ 
+
+# Python2Exe imports PyInstaller at module level; compile tests mock run() anyway
+
+try:
+
+    import PyInstaller.__main__
+
+    import Python2Exe
+
+except ImportError:
+
+    pyinstaller = mock.MagicMock()
+
+    pyinstaller.__main__ = mock.MagicMock()
+
+    with mock.patch.dict(sys.modules, {"PyInstaller": pyinstaller, "PyInstaller.__main__": pyinstaller.__main__}):
+
+        import Python2Exe
+
+ 
+
 class TestExecuter(unittest.TestCase):
 
  
@@ -150,6 +178,282 @@ class TestExecuter(unittest.TestCase):
 
  
 
+class TestInProcessRun(unittest.TestCase):
+
+    
+
+    def setUp(self):
+
+        """
+
+        Set up a temporary script directory with a helper module.
+
+        """
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        self.script_dir = Path(self.temp_dir.name).resolve()
+
+        self.helper = self.script_dir / "py2exe_test_helper.py"
+
+        self.script = self.script_dir / "script.py"
+
+        self.script.write_text(
+
+            "import os, sys\n"
+
+            "import py2exe_test_helper\n"
+
+            "os.chdir(os.path.dirname(os.path.abspath(__file__)))\n"
+
+            "sys.exit(py2exe_test_helper.VALUE)\n"
+
+        )
+
+        self.cwd = os.getcwd()
+
+    
+
+    def tearDown(self):
+
+        """
+
+        Clean up the test files.
+
+        """
+
+        os.chdir(self.cwd)
+
+        self.temp_dir.cleanup()
+
+    
+
+    def test_global_state_is_restored(self):
+
+        """
+
+        Test that edits to imported modules are picked up and the working directory is restored.
+
+        """
+
+        executer = Python2Exe.Executer(self.script)
+
+        
+
+        self.helper.write_text("VALUE = 0\n")
+
+        self.assertTrue(executer.test_file([]))
+
+        self.assertEqual(os.getcwd(), self.cwd)
+
+        self.assertNotIn("py2exe_test_helper", sys.modules)
+
+        
+
+        self.helper.write_text("VALUE = 42\n")
+
+        self.assertFalse(executer.test_file([]))
+
+    
+
+    def test_file_path_is_absolute(self):
+
+        """
+
+        Test that a relative path still points at the script after the directory changes.
+
+        """
+
+        os.chdir(self.script_dir)
+
+        executer = Python2Exe.Executer("script.py")
+
+        os.chdir(self.cwd)
+
+        
+
+        self.assertEqual(executer.file, self.script)
+
+    
+
+    def test_script_importing_numpy_can_be_retested(self):
+
+        """
+
+        Test that a script using a C extension passes on repeated in-process runs.
+
+        """
+
+        try:
+
+            import numpy
+
+        except ImportError:
+
+            self.skipTest("numpy is not installed")
+
+        
+
+        uses_numpy = self.script_dir / "uses_numpy.py"
+
+        uses_numpy.write_text("import numpy\nprint(numpy.arange(3).sum())\n")
+
+        executer = Python2Exe.Executer(uses_numpy)
+
+        
+
+        self.assertTrue(executer.test_file([]))
+
+        self.assertTrue(executer.test_file([]))
+
+        self.assertIs(sys.modules["numpy"], numpy)
+
+ 
+
+class TestExecuterHelpers(unittest.TestCase):
+
+    
+
+    def setUp(self):
+
+        """
+
+        Set up temporary scripts that pass, exit non-zero, and raise.
+
+        """
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        self.script_dir = Path(self.temp_dir.name)
+
+        self.scripts = {}
+
+        for name, body in [
+
+            ("passing", "import sys\nprint(sys.argv[1:])\n"),
+
+            ("exit_code", "import sys\nsys.exit(3)\n"),
+
+            ("raises", "raise ValueError('broken')\n"),
+
+        ]:
+
+            self.scripts[name] = self.script_dir / f"{name}.py"
+
+            self.scripts[name].write_text(body)
+
+    
+
+    def tearDown(self):
+
+        """
+
+        Clean up the test files.
+
+        """
+
+        self.temp_dir.cleanup()
+
+    
+
+    def test_parse_imports(self):
+
+        """
+
+        Test that imports are split on commas with blanks and duplicates dropped.
+
+        """
+
+        self.assertEqual(Python2Exe.parse_imports(" pandas, numpy,,pandas , "), ["pandas", "numpy"])
+
+        self.assertEqual(Python2Exe.parse_imports(""), [])
+
+    
+
+    def test_parse_arguments(self):
+
+        """
+
+        Test that test arguments are split on tildes.
+
+        """
+
+        self.assertEqual(Python2Exe.parse_arguments("a ~ b c~d"), ["a", "b c", "d"])
+
+        self.assertEqual(Python2Exe.parse_arguments(""), [])
+
+    
+
+    def test_get_imports_returns_entered_imports(self):
+
+        """
+
+        Test that entered imports are returned rather than discarded.
+
+        """
+
+        executer = Python2Exe.Executer(self.scripts["passing"])
+
+        with mock.patch("builtins.input", return_value="chardet, pandas, chardet"):
+
+            self.assertEqual(executer.get_imports(), ["chardet", "pandas"])
+
+        with mock.patch("builtins.input", return_value=" "):
+
+            self.assertIsNone(executer.get_imports())
+
+    
+
+    def test_compile_passes_one_hidden_import_per_module(self):
+
+        """
+
+        Test that each hidden import gets its own PyInstaller flag.
+
+        """
+
+        executer = Python2Exe.Executer(self.scripts["passing"])
+
+        with mock.patch.object(Python2Exe.PyInstaller.__main__, "run") as run:
+
+            self.assertTrue(executer.compile_python(imports=["chardet", "pandas"]))
+
+        
+
+        args = run.call_args[0][0]
+
+        self.assertEqual(args[0], str(self.scripts["passing"].resolve()))
+
+        self.assertIn("--hidden-import=chardet", args)
+
+        self.assertIn("--hidden-import=pandas", args)
+
+        self.assertFalse(any("," in arg for arg in args if arg.startswith("--hidden-import")))
+
+        self.assertNotIn("--clean", args)
+
+    
+
+    def test_test_file_results(self):
+
+        """
+
+        Test that test_file only passes for scripts that exit cleanly, in both modes.
+
+        """
+
+        for isolated in (False, True):
+
+            for name, expected in [("passing", True), ("exit_code", False), ("raises", False)]:
+
+                with self.subTest(isolated=isolated, script=name):
+
+                    executer = Python2Exe.Executer(self.scripts[name], isolated=isolated)
+
+                    self.assertEqual(executer.test_file(["arg1"]), expected)
+
+ 
+
 if __name__ == '__main__':
 
     unittest.main()
\ No newline at end of file
@@ -12,8 +12,22 @@ Date Created: 1/10/2024
 
 from pathlib import Path
 
+import argparse
+
+import os
+
 import sys
 
+import runpy
+
+import hashlib
+
+import importlib.machinery
+
+import traceback
+
+import tempfile
+
 import subprocess
 
 import PyInstaller.__main__
@@ -22,6 +36,12 @@ import logging
 
  
 
+# seconds a test run may take before it is treated as a failure
+
+TEST_TIMEOUT = 60
+
+ 
+
 # Set up logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -61,12 +81,42 @@ def get_yes_no(prompt: str) -> bool:
         logging.warning("Invalid input. Please enter 'y' or 'n'.")
 
  
+# split a comma separated import string, dropping blanks and duplicates
+def parse_imports(string: str) -> list:
+
+    parts = [imp.strip() for imp in string.split(",") if imp.strip()]
+
+    # drop duplicates while keeping the order they were entered in
+
+    return list(dict.fromkeys(parts))
+
+ 
+# split a tilde separated argument string
+def parse_arguments(string: str) -> list:
+
+    if not string:
+
+        return []
+
+    return [arg.strip() for arg in string.split("~")]
+
+ 
 
 class Executer:
 
-    def __init__(self, file=None):
+    def __init__(self, file=None, isolated: bool = False):
+
+        # absolute, so a test that changes directory cannot break later compiles
+
+        self.file = Path(file).resolve()
+
+        # run tests in a separate interpreter instead of in-process
 
-        self.file = Path(file)
+        self.isolated = isolated
+
+        # stat once here instead of on every test iteration
+
+        self._valid = self.file.is_file()
 
  
     # grabs imports from user
@@ -76,13 +126,13 @@ class Executer:
 
         string = input("Example: string = 'chardet, pandas'\n\n")
 
-        final_string = [imp.strip() for imp in string.split(",")]
+        final_string = parse_imports(string)
 
         logging.info(f"Entered imports: {final_string}")
 
        
 
-        if len(string) > 2:
+        if not final_string:
 
             return None
 
@@ -102,29 +152,143 @@ class Executer:
 
             test_file_arguments = input("Separate each testing argument with a tilde (~): ")
 
-            final_arguments = [arg.strip() for arg in test_file_arguments.split("~")]
-
-            return final_arguments
+            return parse_arguments(test_file_arguments)
 
         else:
 
             return []
 
  
+    # run the file in this interpreter, avoiding a fork and interpreter startup
+    def run_in_process(self, arguments: list) -> bool:
+
+        old_argv = sys.argv
+
+        old_path = sys.path[:]
+
+        old_cwd = os.getcwd()
+
+        old_modules = set(sys.modules)
+
+        sys.argv = [str(self.file)] + arguments
+
+        # match `python file.py`, which puts the script's directory first on sys.path
+
+        sys.path.insert(0, str(self.file.parent))
+
+        try:
+
+            runpy.run_path(str(self.file), run_name="__main__")
+
+        except SystemExit as e:
+
+            if e.code not in (None, 0):
+
+                logging.error(f"Test failed with exit code {e.code}.")
+
+                return False
+
+        except Exception:
+
+            logging.error(f"Test failed:\n{traceback.format_exc()}")
+
+            return False
+
+        finally:
+
+            sys.argv = old_argv
+
+            sys.path[:] = old_path
+
+            os.chdir(old_cwd)
+
+            # forget the script's own modules so edits show up on the next test
+
+            for name in set(sys.modules) - old_modules:
+
+                if self.is_local_module(sys.modules[name]):
+
+                    del sys.modules[name]
+
+        return True
+
+ 
+
+    # pure Python modules next to the script, which are safe to import again;
+
+    # C extensions (numpy, pandas, ...) cannot be loaded twice in one process
+
+    def is_local_module(self, module) -> bool:
+
+        module_file = getattr(module, "__file__", None)
+
+        if not module_file:
+
+            return False
+
+        path = Path(module_file).resolve()
+
+        if path.name.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES)):
+
+            return False
+
+        if "site-packages" in path.parts or "dist-packages" in path.parts:
+
+            return False
+
+        return path.is_relative_to(self.file.parent)
+
+ 
+    # run the file in a fresh interpreter, for scripts that change global state
+    def run_isolated(self, arguments: list) -> bool:
+
+        command = [sys.executable, str(self.file)] + arguments
+
+        try:
+
+            result = subprocess.run(command, capture_output=True, text=True, timeout=TEST_TIMEOUT)
+
+        except subprocess.TimeoutExpired:
+
+            logging.error(f"Test failed: '{self.file}' did not finish within {TEST_TIMEOUT} seconds.")
+
+            return False
+
+ 
+
+        if result.stdout:
+
+            logging.info(f"Output:\n{result.stdout}")
+
+        if result.returncode != 0:
+
+            logging.error(f"Test failed with exit code {result.returncode}:\n{result.stderr}")
+
+            return False
+
+        return True
+
+ 
     # test file execution
-    def test_file(self) -> bool:
+    def test_file(self, arguments: list = None) -> bool:
 
-        arguments = self.handle_test_file_arguments()
+        if arguments is None:
 
-        command = ["python", str(self.file)] + arguments
+            arguments = self.handle_test_file_arguments()
 
  
 
-        if self.file.exists():
+        if self._valid:
 
             logging.info(f"Testing file '{self.file}' with arguments: {arguments}")
 
-            subprocess.Popen(command)
+            passed = self.run_isolated(arguments) if self.isolated else self.run_in_process(arguments)
+
+            if not passed:
+
+                return False
+
+ 
 
             logging.info("Python syntax is fine! Ready to turn into an executable.")
 
@@ -137,66 +301,114 @@ class Executer:
         return False
 
  
+    # per-file PyInstaller build directory, reused between compiles of the same script
+    def get_workpath(self) -> str:
+
+        digest = hashlib.md5(str(self.file.resolve()).encode(), usedforsecurity=False).hexdigest()
+
+        return str(Path(tempfile.gettempdir()) / f"py2exe_cache_{digest}")
+
+ 
     # compile python file to executable
-    def compile_python(self):
+    def compile_python(self, clean: bool = False, imports: list = None) -> bool:
 
-        import_string = self.get_imports()
+        import_string = self.get_imports() if imports is None else imports
 
         logging.info("Compiling Python into an executable....")
 
  
 
-        try:
+        args = [
 
-            if isinstance(import_string, list):
+            str(self.file),
 
-                PyInstaller.__main__.run([
+            '--onefile',
 
-                    str(self.file),
+            '--windowed',
 
-                    '--onefile',
+            '--workpath', self.get_workpath(),
 
-                    '--windowed',
+        ]
 
-                    '--hidden-import=' + ','.join(import_string),
+        # --clean throws the cached analysis away, so only do it when asked
 
-                ])
+        if clean:
 
-            else:
+            args.append('--clean')
 
-                PyInstaller.__main__.run([
+        # PyInstaller expects one --hidden-import flag per module
 
-                    str(self.file),
+        if isinstance(import_string, list):
 
-                    '--onefile',
+            args.extend(f'--hidden-import={module}' for module in import_string)
 
-                    '--windowed',
+ 
+
+        try:
 
-                ])
+            PyInstaller.__main__.run(args)
 
         except Exception as e:
 
             logging.error(f"Error during compilation: {e}")
 
+            return False
+
+        return True
+
  
 # entry point
 def main():
 
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description="Test a Python file and convert it to an executable.")
 
-        logging.error("Usage: python script.py <filename>")
+    parser.add_argument("file", help="Python file to test and compile")
 
-        sys.exit(1)
+    parser.add_argument("--batch", action="store_true",
+
+                        help="test and compile without prompting, for scripted builds")
+
+    parser.add_argument("--imports", default="",
+
+                        help="comma separated third-party imports, e.g. 'chardet, pandas' (batch mode)")
+
+    parser.add_argument("--args", default="",
+
+                        help="test arguments separated with a tilde (~) (batch mode)")
+
+    parser.add_argument("--isolated", action="store_true",
+
+                        help="test in a separate Python process instead of in-process")
+
+    parser.add_argument("--clean", action="store_true",
+
+                        help="discard PyInstaller's cached analysis and rebuild from scratch")
+
+    options = parser.parse_args()
 
    
 
-    file = validate_file(sys.argv[1])
+    file = validate_file(options.file)
 
-    compile_file = True
+    executer = Executer(file, isolated=options.isolated)
 
  
 
-    executer = Executer(file)
+    if options.batch:
+
+        if not executer.test_file(parse_arguments(options.args)):
+
+            sys.exit(1)
+
+        if not executer.compile_python(clean=options.clean, imports=parse_imports(options.imports)):
+
+            sys.exit(1)
+
+        return
+
+ 
+
+    compile_file = True
 
     while compile_file:
 
@@ -214,7 +426,7 @@ def main():
 
             logging.info("Results of file are:\n")
 
-            executer.compile_python()
+            executer.compile_python(clean=options.clean)
 
             break
 